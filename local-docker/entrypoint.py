@@ -47,16 +47,65 @@ when the proxy is working.
 When the process exits with exit code 100 that means the proxy is active.
 """
 
+import struct
 import sys
 import typing
+from ipaddress import IPv6Address
+from itertools import chain
 from json import loads
-from socket import gaierror, gethostbyname
+from socket import gaierror, gethostbyname, inet_ntoa
 from subprocess import Popen
+from threading import Event, Thread
 from time import sleep, time
 
-from telepresence.connect import SSH, expose_local_services
-from telepresence.outbound import get_sshuttle_command
-from telepresence.runner import Runner
+
+# Kernel socket tables, and the connection state code for ESTABLISHED
+PROC_NET_TCP = ("/proc/net/tcp", "/proc/net/tcp6")
+TCP_ESTABLISHED = b"01"
+
+# How the ports of the incoming ssh (sshd) and of the tunnel it forwards to
+# the cluster appear in the socket tables, as a port field and its delimiter
+SSH_PORT_FIELDS = tuple(
+    ":{:04X} ".format(port).encode("ascii") for port in (38022, 38023)
+)
+
+
+def table_lines(table: str) -> typing.Iterator[bytes]:
+    """
+    Yield the rows of a kernel socket table, without its header. The table
+    is read in one go but the rows are only split off as they're consumed.
+    """
+    try:
+        with open(table, "rb") as table_file:
+            data = table_file.read()
+    except FileNotFoundError:
+        return  # No IPv6 support
+    start = data.find(b"\n") + 1
+    while 0 < start < len(data):
+        end = data.find(b"\n", start)
+        if end < 0:
+            end = len(data)
+        yield data[start:end]
+        start = end + 1
+
+
+def decode_address(address: bytes) -> typing.Optional[str]:
+    """
+    Decode an address:port pair from /proc/net/tcp or /proc/net/tcp6 and
+    return the IPv4 address, or None for an IPv6 address sshuttle can't use.
+    The address is a hex dump of 32-bit words in host byte order.
+    """
+    ip_hex, _ = address.split(b":")
+    packed = b"".join(
+        struct.pack("=I", int(ip_hex[idx:idx + 8], 16))
+        for idx in range(0, len(ip_hex), 8)
+    )
+    if len(packed) == 4:
+        return inet_ntoa(packed)
+    mapped = IPv6Address(packed).ipv4_mapped
+    if mapped is None:
+        return None
+    return str(mapped)
 
 
 def main() -> None:
@@ -70,6 +119,12 @@ def main() -> None:
 
 def proxy(config: typing.Dict[str, typing.Any]) -> None:
     """Start sshuttle proxy to Kubernetes."""
+    # Imported here so wait mode, which is started over and over during
+    # startup, doesn't pay for importing Telepresence.
+    from telepresence.connect import SSH, expose_local_services
+    from telepresence.outbound import get_sshuttle_command
+    from telepresence.runner import Runner
+
     cidrs = config["cidrs"]
     expose_ports = config["expose_ports"]
     to_pod = config["to_pod"]
@@ -86,21 +141,26 @@ def proxy(config: typing.Dict[str, typing.Any]) -> None:
             "SSH from local container to the cluster failed to start."
         )
 
-    # Figure out IP addresses to exclude, from the incoming ssh
-    exclusions = []
-    netstat_output = runner.get_output(["netstat", "-n"])
-    for line in netstat_output.splitlines():
-        if not line.startswith("tcp") or "ESTABLISHED" not in line:
-            continue
-        parts = line.split()
-        try:
-            for address in (parts[3], parts[4]):
-                ip, port = address.split(":")
-                exclusions.extend(["-x", ip])
-        except (IndexError, ValueError):
-            runner.write("Failed on line: " + line)
-            raise
-    assert exclusions, netstat_output
+    # Figure out IP addresses to exclude, from the incoming ssh and the tunnel
+    ips = set()  # type: typing.Set[str]
+    for table in PROC_NET_TCP:
+        for line in table_lines(table):
+            # Most rows are unrelated, so skip them before splitting
+            if not any(field in line for field in SSH_PORT_FIELDS):
+                continue
+            parts = line.split()
+            try:
+                if parts[3] != TCP_ESTABLISHED:
+                    continue
+                for address in (parts[1], parts[2]):
+                    ip = decode_address(address)
+                    if ip is not None:
+                        ips.add(ip)
+            except (IndexError, ValueError):
+                runner.write("Failed on line: {!r}".format(line))
+                raise
+    assert ips, "No established TCP connections found"
+    exclusions = list(chain.from_iterable(("-x", ip) for ip in sorted(ips)))
 
     # Start the sshuttle VPN-like thing:
     sshuttle_cmd = get_sshuttle_command(ssh, "nat") + exclusions + cidrs
@@ -113,16 +173,37 @@ def proxy(config: typing.Dict[str, typing.Any]) -> None:
     runner.wait_for_exit(main_process)
 
 
+def resolve(name: str, resolved: Event) -> None:
+    """Look up the name, setting the event if that succeeds."""
+    try:
+        gethostbyname(name)
+        resolved.set()
+    except gaierror:
+        pass
+
+
 def wait() -> None:
     """Wait for proxying to be live."""
     start = time()
+    resolved = Event()
+    delay = 0.05
     while time() - start < 30:
-        try:
-            gethostbyname("kubernetes.default")
+        # Lookups run in daemon threads so a stuck resolver can't block us.
+        # If one is still running after a moment, start another alongside
+        # it; an answer from any of them counts, however late.
+        lookup = Thread(
+            target=resolve, args=("kubernetes.default", resolved), daemon=True
+        )
+        lookup.start()
+        lookup.join(0.5)
+        if not lookup.is_alive():
+            # Back off so a fast startup is noticed quickly but a slow one
+            # doesn't keep us busy
+            resolved.wait(delay)
+            delay = min(delay * 1.5, 1.0)
+        if resolved.is_set():
             sleep(1)  # just in case there's more to startup
             sys.exit(100)
-        except gaierror:
-            sleep(0.1)
     sys.exit("Failed to connect to proxy in remote cluster.")
 
 
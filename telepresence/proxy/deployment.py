@@ -16,7 +16,7 @@ import json
 import os
 from copy import deepcopy
 from subprocess import CalledProcessError
-from typing import Dict, Optional, Tuple
+from typing import Dict, List, Optional, Tuple
 
 from telepresence import (
     TELEPRESENCE_REMOTE_IMAGE, TELEPRESENCE_REMOTE_IMAGE_OCP,
@@ -25,7 +25,8 @@ from telepresence import (
 from telepresence.cli import PortMapping
 from telepresence.runner import Runner
 
-from .remote import get_deployment
+from .manifest import dump_manifest, load_manifest
+from .remote import forget_resource_json, get_deployment, get_resource_json
 
 
 def get_image_name(runner: Runner, expose: PortMapping) -> str:
@@ -40,18 +41,17 @@ def get_image_name(runner: Runner, expose: PortMapping) -> str:
     if ocp_env in ("true", "on", "yes", "1", "always"):
         return TELEPRESENCE_REMOTE_IMAGE_OCP
 
-    ocp_image_allowed = True
-    if ocp_env in ("false", "off", "no", "0", "never"):
-        ocp_image_allowed = False
-    elif ocp_env not in ("auto", "automatic", "default"):
-        runner.show(
-            "\nWARNING: Ignoring {} environment variable with value {!r}. "
-            "Accepted values are YES or NO or AUTO. "
-            "Using AUTO.".format(ocp_env_name, ocp_env_value)
-        )
+    # Only look at the cluster if the user left the choice to us
+    if ocp_env not in ("false", "off", "no", "0", "never"):
+        if ocp_env not in ("auto", "automatic", "default"):
+            runner.show(
+                "\nWARNING: Ignoring {} environment variable with value {!r}. "
+                "Accepted values are YES or NO or AUTO. "
+                "Using AUTO.".format(ocp_env_name, ocp_env_value)
+            )
+        if runner.kubectl.cluster_is_openshift:
+            return TELEPRESENCE_REMOTE_IMAGE_OCP
 
-    if ocp_image_allowed and runner.kubectl.cluster_is_openshift:
-        return TELEPRESENCE_REMOTE_IMAGE_OCP
     if expose.has_privileged_ports():
         return TELEPRESENCE_REMOTE_IMAGE_PRIV
     return TELEPRESENCE_REMOTE_IMAGE
@@ -72,12 +72,8 @@ def existing_deployment(
         "Deployment {}".format(deployment_arg)
     )
     try:
-        d_json = json.loads(
-            runner.get_output(
-                runner.kubectl(
-                    "get", "deployment", deployment_arg, "-o", "json"
-                )
-            )
+        d_json = get_resource_json(
+            runner, "deploy", deployment_arg, reveal=True
         )
 
         _set_expose_ports(expose, deployment_arg, d_json)
@@ -106,13 +102,7 @@ def existing_deployment_openshift(
         "DeploymentConfig {}".format(deployment_arg)
     )
     try:
-        d_json = json.loads(
-            runner.get_output(
-                runner.kubectl(
-                    "get", "deploymentconfig", deployment_arg, "-o", "json"
-                )
-            )
-        )
+        d_json = get_resource_json(runner, "dc", deployment_arg, reveal=True)
 
         _set_expose_ports(expose, deployment_arg, d_json)
     except CalledProcessError as exc:
@@ -167,6 +157,19 @@ spec:
       {service_account_field}
 """
 
+_service_template = """---
+apiVersion: v1
+kind: Service
+metadata:
+  labels:
+    telepresence: {run_id}
+  name: {name}
+spec:
+  ports:
+{ports_field}  selector:
+    telepresence: {run_id}
+"""
+
 
 def _get_deployment_yaml(
     name: str,
@@ -174,25 +177,41 @@ def _get_deployment_yaml(
     image_name: str,
     service_account: str,
     env: Dict,
+    ports: List[int],
 ) -> str:
+    """
+    Return the YAML for the new Deployment, followed by a Service exposing
+    the given ports if there are any.
+    """
     service_account_field = ""
     if service_account:
         service_account_field = "serviceAccount: %s" % service_account
     env_field = ""
     if env:
-        env_lines = ["env:\n"]
-        for key, value in env.items():
-            env_lines.append("        - name: %s\n" % key)
-            env_lines.append("          value: %s\n" % value)
-        env_lines.append("        ")
-        env_field = "".join(env_lines)
-    return _deployment_template.format(
+        # Values are written as JSON strings, which YAML reads verbatim, so
+        # they aren't reinterpreted as numbers, booleans, etc.
+        env_field = "env:\n%s        " % "".join(
+            "        - name: %s\n          value: %s\n" %
+            (key, json.dumps(str(value))) for key, value in env.items()
+        )
+    deployment_yaml = _deployment_template.format(
         name=name,
         run_id=run_id,
         image_name=image_name,
         env_field=env_field,
         service_account_field=service_account_field,
     )
+    if not ports:
+        return deployment_yaml
+    ports_field = "".join(
+        "  - name: port-%s\n    port: %s\n    targetPort: %s\n" %
+        (port, port, port) for port in ports
+    )
+    return deployment_yaml + _service_template.format(
+        name=name,
+        run_id=run_id,
+        ports_field=ports_field,
+    )
 
 
 def create_new_deployment(
@@ -212,9 +231,8 @@ def create_new_deployment(
         "new Deployment {}".format(deployment_arg)
     )
 
-    def remove_existing_deployment(quiet=False):
-        if not quiet:
-            runner.show("Cleaning up Deployment {}".format(deployment_arg))
+    def remove_existing_deployment():
+        runner.show("Cleaning up Deployment {}".format(deployment_arg))
         runner.check_call(
             runner.kubectl(
                 "delete",
@@ -223,17 +241,20 @@ def create_new_deployment(
                 "--selector=telepresence=" + run_id,
             )
         )
+        forget_resource_json(runner)
 
+    # There's no need to delete leftovers before creating: the selector
+    # matches this session's ID, which nothing in the cluster has yet.
     runner.add_cleanup("Delete new deployment", remove_existing_deployment)
-    remove_existing_deployment(quiet=True)
-    # Define the deployment as yaml
-    # Create the deployment via yaml
+    # Define the deployment, plus a service exposing it if needed, as yaml.
+    # Create the deployment and service via yaml
     deployment_yaml = _get_deployment_yaml(
         deployment_arg,
         run_id,
         get_image_name(runner, expose),
         service_account,
         deployment_env,
+        sorted(expose.remote()),
     )
     try:
         runner.check_call(
@@ -246,27 +267,7 @@ def create_new_deployment(
                 deployment_arg, exc.stderr
             )
         )
-    # Expose the deployment with a service
-    if expose.remote():
-        command = [
-            "expose",
-            "deployment",
-            deployment_arg,
-        ]
-        # Provide a stable argument ordering.  Reverse it because that
-        # happens to make some current tests happy but in the long run
-        # that's totally arbitrary and doesn't need to be maintained.
-        # See issue 494.
-        for port in sorted(expose.remote(), reverse=True):
-            command.append("--port={}".format(port))
-        try:
-            runner.check_call(runner.kubectl(*command))
-        except CalledProcessError as exc:
-            raise runner.fail(
-                "Failed to expose deployment {}:\n{}".format(
-                    deployment_arg, exc.stderr
-                )
-            )
+    forget_resource_json(runner)
     span.end()
     return deployment_arg, run_id
 
@@ -341,6 +342,7 @@ def supplant_deployment(
                 "--replicas={}".format(replicas)
             )
         )
+        forget_resource_json(runner)
 
     def delete_new_deployment(check):
         """Delete the new (copied) deployment"""
@@ -357,14 +359,16 @@ def supplant_deployment(
                 "delete", "deployment", new_deployment_name, *ignore
             )
         )
+        forget_resource_json(runner)
 
     # Launch the new deployment
     runner.add_cleanup("Delete new deployment", delete_new_deployment, True)
     delete_new_deployment(False)  # Just in case
     runner.check_call(
         runner.kubectl("apply", "-f", "-"),
-        input=json.dumps(new_deployment_json).encode("utf-8")
+        input=dump_manifest(new_deployment_json)
     )
+    forget_resource_json(runner)
 
     # Scale down the original deployment
     runner.add_cleanup(
@@ -377,6 +381,23 @@ def supplant_deployment(
     return new_deployment_name, run_id
 
 
+def _copy_with(manifest: Dict, *keys: str) -> Dict:
+    """
+    Return a shallow copy of the manifest in which the (dictionary) values of
+    the given keys are also shallow copies.
+    """
+    result = dict(manifest)
+    for key in keys:
+        result[key] = dict(manifest[key])
+    return result
+
+
+def _add_telepresence_label(metadata: Dict, run_id: str) -> None:
+    labels = dict(metadata.get("labels", {}))
+    labels["telepresence"] = run_id
+    metadata["labels"] = labels
+
+
 def new_swapped_deployment(
     runner: Runner,
     old_deployment: Dict,
@@ -403,18 +424,24 @@ def new_swapped_deployment(
     Returns dictionary that can be encoded to JSON and used with kubectl apply.
     Mutates the passed-in PortMapping to include container ports.
     """
-    new_deployment_json = deepcopy(old_deployment)
+    # Copy only what gets modified, sharing the rest with the original, which
+    # must be left untouched.
+    new_deployment_json = _copy_with(old_deployment, "metadata", "spec")
     new_deployment_json["spec"]["replicas"] = 1
-    new_deployment_json["metadata"].setdefault("labels",
-                                               {})["telepresence"] = run_id
-    ndj_template = new_deployment_json["spec"]["template"]
-    ndj_template["metadata"].setdefault("labels", {})["telepresence"] = run_id
+    _add_telepresence_label(new_deployment_json["metadata"], run_id)
+    ndj_template = _copy_with(
+        new_deployment_json["spec"]["template"], "metadata", "spec"
+    )
+    new_deployment_json["spec"]["template"] = ndj_template
+    _add_telepresence_label(ndj_template["metadata"], run_id)
     if service_account:
         ndj_template["spec"]["serviceAccountName"] = service_account
-    for container, old_container in zip(
-        ndj_template["spec"]["containers"],
-        old_deployment["spec"]["template"]["spec"]["containers"],
-    ):
+    ndj_template["spec"]["containers"] = [
+        deepcopy(container)
+        if container["name"] == container_to_update else container
+        for container in ndj_template["spec"]["containers"]
+    ]
+    for container in ndj_template["spec"]["containers"]:
         if container["name"] == container_to_update:
             # Merge container ports into the expose list
             expose.merge_automatic_ports([
@@ -485,7 +512,7 @@ def swap_deployment_openshift(
     run_id = runner.session_id
     deployment, container = _split_deployment_container(deployment_arg)
 
-    dc_json_with_triggers = json.loads(
+    dc_json_with_triggers = load_manifest(
         runner.get_output(
             runner.kubectl(
                 "get", "dc/{}".format(deployment), "-o", "json", "--export"
@@ -499,19 +526,18 @@ def swap_deployment_openshift(
         )
     )
 
-    dc_json = json.loads(
-        runner.get_output(
-            runner.kubectl(
-                "get", "dc/{}".format(deployment), "-o", "json", "--export"
-            )
-        )
-    )
+    # The only difference from the original is the list of triggers we just
+    # removed, so build the triggerless config locally rather than fetching
+    # it again.
+    dc_json = _copy_with(dc_json_with_triggers, "spec")
+    dc_json["spec"]["triggers"] = []
 
     def apply_json(json_config):
         runner.check_call(
             runner.kubectl("replace", "-f", "-"),
-            input=json.dumps(json_config).encode("utf-8")
+            input=dump_manifest(json_config)
         )
+        forget_resource_json(runner)
         # Now that we've updated the deployment config,
         # let's rollout latest version to apply the changes
         runner.check_call(
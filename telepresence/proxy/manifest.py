@@ -12,11 +12,34 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import json
 from typing import Any, Dict, Iterable
 
+try:
+    import orjson  # type: ignore
+except ImportError:  # Not available, e.g., in the packaged executable
+    orjson = None  # type: ignore
+
 Manifest = Dict[str, Any]
 
 
+def load_manifest(text: str) -> Manifest:
+    """Parse JSON output from kubectl, using orjson if it is available."""
+    if orjson is not None:
+        manifest = orjson.loads(text)  # type: Manifest
+    else:
+        manifest = json.loads(text)
+    return manifest
+
+
+def dump_manifest(manifest: Manifest) -> bytes:
+    """Encode a manifest as JSON to pass to kubectl as input."""
+    if orjson is not None:
+        encoded = orjson.dumps(manifest)  # type: bytes
+        return encoded
+    return json.dumps(manifest).encode("utf-8")
+
+
 def make_k8s_list(items: Iterable[Manifest]) -> Manifest:
     return {
         "apiVersion": "v1",
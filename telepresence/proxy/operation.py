@@ -12,7 +12,7 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-import json
+from copy import deepcopy
 from subprocess import CalledProcessError
 from typing import Any, Dict, Iterable, List, NamedTuple
 
@@ -22,11 +22,11 @@ from telepresence.runner import Runner
 
 from .deployment import get_image_name
 from .manifest import (
-    Manifest, make_k8s_list, make_new_proxy_pod_manifest, make_pod_manifest,
-    make_svc_manifest
+    Manifest, dump_manifest, make_k8s_list, make_new_proxy_pod_manifest,
+    make_pod_manifest, make_svc_manifest
 )
 from .remote import (
-    RemoteInfo, get_deployment, get_pod_for_deployment,
+    RemoteInfo, forget_resource_json, get_deployment, get_pod_for_deployment,
     make_remote_info_from_pod, wait_for_pod
 )
 
@@ -71,11 +71,10 @@ def create_with_cleanup(runner: Runner, manifests: Iterable[Manifest]) -> None:
     kinds = set(str(manifest["kind"]).capitalize() for manifest in manifests)
     kinds_display = ", ".join(kinds)
     manifest_list = make_k8s_list(manifests)
-    manifest_json = json.dumps(manifest_list)
     try:
         runner.check_call(
             runner.kubectl("create", "-f", "-"),
-            input=manifest_json.encode("utf-8")
+            input=dump_manifest(manifest_list)
         )
     except CalledProcessError as exc:
         raise runner.fail(
@@ -182,26 +181,34 @@ class Swap(ProxyOperation):
             max_width=(50 - (len(runner.session_id) + 1))
         )
 
+        # The deployment manifest is shared with later get_deployment()
+        # calls, so copy everything that gets modified below.
+
         # Construct the new Pod's metadata
-        pod_metadata = template["metadata"]  # type: Manifest
+        pod_metadata = dict(template["metadata"])  # type: Manifest
         pod_metadata["name"] = new_pod_name
 
-        labels = pod_metadata.setdefault("labels", {})  # type: Dict[str, str]
+        labels = dict(pod_metadata.get("labels", {}))  # type: Dict[str, str]
         labels["telepresence"] = runner.session_id
+        pod_metadata["labels"] = labels
 
         # Perform the relevant swap changes to the pod spec
-        pod_spec = template["spec"]
+        pod_spec = dict(template["spec"])  # type: Manifest
         pod_spec["restartPolicy"] = "Never"
         if self.intent.service_account:
             pod_spec["serviceAccount"] = self.intent.service_account
 
         # Find the relevant container
-        container = find_container(pod_spec, self.intent.container)
-        if not container:
+        original = find_container(pod_spec, self.intent.container)
+        if not original:
             raise runner.fail(
                 "Unable to find container {} in pod spec for deployment {}".
                 format(self.intent.container, self.intent.name)
             )
+        container = deepcopy(original)
+        pod_spec["containers"] = [
+            container if c is original else c for c in pod_spec["containers"]
+        ]
 
         # Perform the relevant swap changes to the container
         container["image"] = get_image_name(runner, self.intent.expose)
@@ -258,6 +265,7 @@ class Swap(ProxyOperation):
                     "--replicas={}".format(replicas)
                 )
             )
+            forget_resource_json(runner)
 
         create_with_cleanup(runner, self.manifests)
 
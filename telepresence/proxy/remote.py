@@ -12,14 +12,13 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-import json
 from subprocess import CalledProcessError
 from typing import Any, Dict, List, Optional
 
 from telepresence import image_version
 from telepresence.runner import Runner
 
-from .manifest import Manifest
+from .manifest import Manifest, load_manifest
 
 
 class RemoteInfo(object):
@@ -59,24 +58,53 @@ class RemoteInfo(object):
         return version
 
 
+def get_resource_json(
+    runner: Runner, kind: str, name: str, reveal: bool = False
+) -> Manifest:
+    """
+    Retrieve the manifest of the named resource. The parsed result is reused
+    for the rest of the session, so code that modifies resources in the
+    cluster must call forget_resource_json() afterwards.
+
+    The returned manifest is shared with later callers and must not be
+    mutated; copy whatever needs changing.
+
+    Raises CalledProcessError if kubectl fails.
+    """
+    def fetch() -> Manifest:
+        return load_manifest(
+            runner.get_output(
+                runner.kubectl("get", kind, name, "-o", "json"),
+                reveal=reveal,
+            )
+        )
+
+    key = "{}/{}".format(kind, name)
+    manifest = runner.manifest_cache.lookup(key, fetch)  # type: Manifest
+    return manifest
+
+
+def forget_resource_json(runner: Runner) -> None:
+    """Discard the manifests remembered by get_resource_json()."""
+    runner.manifest_cache.clear()
+
+
 def get_deployment(runner: Runner, name: str) -> Dict[str, Any]:
     """
     Retrieve the Deployment/DeploymentConfig manifest named, or emit an error
-    message for the user.
+    message for the user. The manifest must not be mutated; see
+    get_resource_json().
     """
     if ":" in name:
         name, container = name.split(":", 1)
 
     kube = runner.kubectl
-    manifest = ""
+    deployment = None  # type: Optional[Manifest]
 
     # Maybe try to find an OpenShift DeploymentConfig
     if kube.command == "oc" and kube.cluster_is_openshift:
         try:
-            manifest = runner.get_output(
-                runner.kubectl("get", "dc", name, "-o", "json"),
-                reveal=True,
-            )
+            deployment = get_resource_json(runner, "dc", name, reveal=True)
         except CalledProcessError as exc:
             runner.show(
                 "Failed to find DeploymentConfig {}:\n  {}".format(
@@ -86,21 +114,14 @@ def get_deployment(runner: Runner, name: str) -> Dict[str, Any]:
             runner.show("Will try regular Kubernetes Deployment.")
 
     # No DC or no OpenShift, look for a Deployment
-    if manifest == "":
+    if deployment is None:
         try:
-            manifest = runner.get_output(
-                runner.kubectl("get", "deploy", name, "-o", "json"),
-                reveal=True,
-            )
+            deployment = get_resource_json(runner, "deploy", name, reveal=True)
         except CalledProcessError as exc:
             raise runner.fail(
                 "Failed to find Deployment {}:\n  {}".format(name, exc.stderr)
             )
 
-    # Parse the resulting manifest
-    # This failing is likely a bug, so crash...
-    deployment = json.loads(manifest)  # type: Manifest
-
     return deployment
 
 
@@ -120,7 +141,7 @@ def wait_for_pod(runner: Runner, remote_info: RemoteInfo) -> None:
         pass
     for _ in runner.loop_until(120, 0.25):
         try:
-            pod = json.loads(
+            pod = load_manifest(
                 runner.get_output(
                     runner.kubectl(
                         "get", "pod", remote_info.pod_name, "-o", "json"
@@ -170,7 +191,7 @@ def get_remote_info(
         cmd.append("--selector=telepresence={}".format(run_id))
 
     for _ in runner.loop_until(120, 1):
-        pods = json.loads(runner.get_output(runner.kubectl(*cmd)))["items"]
+        pods = load_manifest(runner.get_output(runner.kubectl(*cmd)))["items"]
         for pod in pods:
             name = pod["metadata"]["name"]
             phase = pod["status"]["phase"]
@@ -240,7 +261,7 @@ def get_pod_for_deployment(
     runner.write("  with labels {}".format(expected_labels))
 
     for _ in runner.loop_until(120, 1):
-        manifest_list = json.loads(runner.get_output(runner.kubectl(*cmd)))
+        manifest_list = load_manifest(runner.get_output(runner.kubectl(*cmd)))
         pods = manifest_list["items"]  # type: List[Manifest]
         for pod in pods:
             name = pod["metadata"]["name"]
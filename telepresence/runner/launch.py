@@ -111,6 +111,9 @@ def _launch_command(
         Thread(target=joiner, daemon=True).start()
     if in_data:
         assert process.stdin is not None  # mypy
-        process.stdin.write(str(in_data, "utf-8"))
-        process.stdin.close()
+        # Write the bytes as-is rather than decoding them for the text stream
+        # to encode again
+        stdin = typing.cast(typing.TextIO, process.stdin)
+        stdin.buffer.write(in_data)
+        stdin.close()
     return process
@@ -125,6 +125,9 @@ class Runner:
         self.cache.invalidate(12 * 60 * 60)
         self.add_cleanup("Save caches", self.cache.save, cache_filename)
 
+        # Kubernetes manifests fetched during this session (not saved)
+        self.manifest_cache = Cache({})
+
         # Docker for Mac doesn't share TMPDIR, so make sure we use /tmp
         # Docker for Windows can't access /tmp, so use a directory it can
         tmp_dir = "/tmp"
@@ -383,6 +386,14 @@ class Runner:
         if input is not None:
             kwargs["input"] = input
 
+        # Allow subprocess to use posix_spawn() instead of fork() + exec().
+        # That requires a full path to the executable and no close_fds. The
+        # latter is safe because Python creates non-inheritable descriptors.
+        kwargs["close_fds"] = False
+        executable = which(args[0], path=(env or os.environ).get("PATH"))
+        if executable:
+            kwargs["executable"] = executable
+
         # Set up capture/logging
         out_logger = self._make_logger(
             track, log_stdout or self.verbose, True, capture_limit
@@ -17,6 +17,7 @@ Unit tests (in-memory, small units of code).
 
 import ipaddress
 import itertools
+import json
 import subprocess
 import sys
 import tempfile
@@ -32,6 +33,9 @@ import telepresence.outbound.container
 import telepresence.outbound.cidr
 import telepresence.outbound.vpn
 import telepresence.proxy.deployment
+import telepresence.proxy.manifest
+import telepresence.proxy.operation
+import telepresence.proxy.remote
 import telepresence.runner.output
 from telepresence.runner.cache import Cache
 from telepresence.runner.kube import KubeInfo
@@ -227,6 +231,7 @@ def test_swap_deployment_changes():
     assert "/telepresence-k8s-priv:" in image
     expected["spec"]["template"]["spec"]["containers"][1]["image"] = image
     assert actual == expected
+    assert original == yaml.safe_load(COMPLEX_DEPLOYMENT)
     assert (9999, 9999) in ports.local_to_remote()
     assert (80, 80) in ports.local_to_remote()
 
@@ -271,6 +276,125 @@ def test_swap_deployment_changes():
     assert (8080, 8080) in ports.local_to_remote()
 
 
+def test_swap_leaves_cached_deployment_alone(monkeypatch):
+    """
+    Preparing a swap doesn't modify the Deployment manifest that later
+    get_deployment() calls in the same session return.
+    """
+    runner = Runner("-", False)
+    runner.kubectl = KubeInfo(
+        "cluster",
+        "cluster_version",
+        False,  # cluster_is_openshift
+        "kubectl",
+        "command_version",
+        "server",
+        "context",
+        "namespace",
+        False,  # in_local_vm
+        False,  # verbose
+    )
+    original = yaml.safe_load(COMPLEX_DEPLOYMENT)
+    original["kind"] = "Deployment"
+    calls = []
+
+    def get_output(args, **kwargs):
+        calls.append(args)
+        return json.dumps(original)
+
+    monkeypatch.setattr(runner, "get_output", get_output)
+
+    before = telepresence.proxy.remote.get_deployment(runner, "my-nginx")
+    assert before == original
+    intent = telepresence.proxy.operation.ProxyIntent(
+        "my-nginx",
+        "nginxhttps",
+        telepresence.cli.PortMapping.parse(["9999"]),
+        {"A": "1"},
+        "",
+    )
+    swap = telepresence.proxy.operation.Swap(intent)
+    swap.prepare(runner)
+    pod = swap.manifests[0]
+    assert pod["spec"]["restartPolicy"] == "Never"
+    assert pod["metadata"]["labels"]["telepresence"] == runner.session_id
+
+    after = telepresence.proxy.remote.get_deployment(runner, "my-nginx")
+    assert after == original
+    assert len(calls) == 1
+
+
+def test_new_deployment_yaml():
+    """
+    The YAML for a new Deployment includes a Service when ports are exposed.
+    """
+    documents = list(
+        yaml.safe_load_all(
+            telepresence.proxy.deployment._get_deployment_yaml(
+                "myname", "random_id_123", "image", "", {
+                    "A": "1",
+                    "B": "yes"
+                }, [8080, 80]
+            )
+        )
+    )
+    assert [d["kind"] for d in documents] == ["Deployment", "Service"]
+    container = documents[0]["spec"]["template"]["spec"]["containers"][0]
+    assert container["env"] == [
+        dict(name="A", value="1"),
+        dict(name="B", value="yes"),
+    ]
+    service = documents[1]
+    assert service["metadata"]["name"] == "myname"
+    assert service["metadata"]["labels"] == {"telepresence": "random_id_123"}
+    assert service["spec"]["selector"] == {"telepresence": "random_id_123"}
+    assert [p["port"] for p in service["spec"]["ports"]] == [8080, 80]
+
+    documents = list(
+        yaml.safe_load_all(
+            telepresence.proxy.deployment._get_deployment_yaml(
+                "myname", "random_id_123", "image", "", {}, []
+            )
+        )
+    )
+    assert [d["kind"] for d in documents] == ["Deployment"]
+
+
+class FakeOrjson:
+    """Stand-in for orjson, which isn't installed for the tests."""
+    @staticmethod
+    def loads(text):
+        return dict(json.loads(text), parsed_by="orjson")
+
+    @staticmethod
+    def dumps(obj):
+        return json.dumps(obj, separators=(",", ":")).encode("utf-8")
+
+
+@pytest.mark.parametrize("orjson", [None, FakeOrjson])
+def test_manifest_json(monkeypatch, orjson):
+    """
+    Manifests are parsed and encoded with orjson if it's available and with
+    the json module otherwise.
+    """
+    monkeypatch.setattr(telepresence.proxy.manifest, "orjson", orjson)
+    manifest = {"kind": "Pod", "metadata": {"name": "caf\u00e9"}}
+
+    loaded = telepresence.proxy.manifest.load_manifest(json.dumps(manifest))
+    if orjson is None:
+        assert loaded == manifest
+    else:
+        assert loaded == dict(manifest, parsed_by="orjson")
+
+    dumped = telepresence.proxy.manifest.dump_manifest(manifest)
+    assert isinstance(dumped, bytes)
+    assert json.loads(dumped.decode("utf-8")) == manifest
+    if orjson is None:
+        assert dumped == json.dumps(manifest).encode("utf-8")
+    else:
+        assert dumped == b'{"kind":"Pod","metadata":{"name":"caf\\u00e9"}}'
+
+
 def test_portmapping():
     """
     Manually set exposed ports always override automatically exposed ports.